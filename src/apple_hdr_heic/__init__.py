@@ -2,6 +2,7 @@ from .lib import (
     apply_hdrgainmap,
     clipped_colorspace_transform,
     load_as_bt2020_linear,
+    load_as_bt2100_pq,
     load_as_displayp3_linear,
     quantize_bt2020_to_bt2100_pq,
 )
@@ -12,6 +13,7 @@ __all__ = [
     "apply_hdrgainmap",
     "clipped_colorspace_transform",
     "load_as_bt2020_linear",
+    "load_as_bt2100_pq",
     "load_as_displayp3_linear",
     "quantize_bt2020_to_bt2100_pq",
 ]
@@ -1,16 +1,16 @@
 import argparse
 from pathlib import Path
 
-import colour
 import cv2
+import numpy as np
 import OpenEXR
 import pillow_heif
 from pillow_heif import HeifFile
 
-from apple_hdr_heic import clipped_colorspace_transform, load_as_displayp3_linear, quantize_bt2020_to_bt2100_pq
+from apple_hdr_heic import clipped_colorspace_transform, load_as_bt2100_pq, load_as_displayp3_linear
 from apple_hdr_heic.lib import REF_WHITE_LUM
 
-COLORSPACE_CHOICES = list(colour.RGB_COLOURSPACES.keys())
+DEFAULT_COLORSPACE = "ITU-R BT.2020"
 
 
 def main() -> None:
@@ -36,22 +36,27 @@ def main() -> None:
         help="Output chroma subsampling; ignored for .png (default: 420)",
     )  # fmt: skip
     parser.add_argument(
-        "--colorspace", type=str, default="ITU-R BT.2020", choices=COLORSPACE_CHOICES,
-        help="Output color space; only relevant for .exr (default: ITU-R BT.2020)",
+        "--colorspace", type=str, default=DEFAULT_COLORSPACE,
+        help=f"Output color space (any colour-science RGB colourspace); only for .exr (default: {DEFAULT_COLORSPACE})",
     )  # fmt: skip
     args = parser.parse_args()
+    # note: colour is slow to import, so the color space is validated here instead of using argparse choices
+    if args.colorspace != DEFAULT_COLORSPACE:
+        import colour
+
+        if args.colorspace not in colour.RGB_COLOURSPACES:
+            parser.error(f"argument --colorspace: invalid choice: {args.colorspace!r}")
 
     assert args.input_image.lower().endswith(".heic")
     assert -1 <= args.quality <= 100
-    dp3_linear = load_as_displayp3_linear(args.input_image)
     output_ext = Path(args.output_image).suffix.lower()
     if output_ext == ".exr":
+        dp3_linear = load_as_displayp3_linear(args.input_image)
         rgb_linear = clipped_colorspace_transform(dp3_linear, "Display P3", args.colorspace)
         bitdepth = checked_bitdepth(args.bitdepth, [16, 32])
         write_exr(args.output_image, rgb_linear, bitdepth=bitdepth, colorspace=args.colorspace)
         return
-    bt2020_linear = clipped_colorspace_transform(dp3_linear, "Display P3", "ITU-R BT.2020")
-    bt2100_pq = quantize_bt2020_to_bt2100_pq(bt2020_linear)
+    bt2100_pq = load_as_bt2100_pq(args.input_image)
     if output_ext == ".png":
         bitdepth = checked_bitdepth(args.bitdepth, [16])
         write_png(args.output_image, bt2100_pq)
@@ -79,7 +84,7 @@ def checked_bitdepth(bitdepth: int | None, choices: list[int]) -> int:
 
 
 def write_png(out_path, rgb_data):
-    cv2.imwrite(out_path, rgb_data[:, :, ::-1])
+    cv2.imwrite(out_path, cv2.cvtColor(rgb_data, cv2.COLOR_RGB2BGR))
     # note: currently Pillow doesn't support 16-bit per channel RGB images
     #       see https://github.com/python-pillow/Pillow/issues/1888
     # note: adding cICP data to PNG files (to indicate BT.2100 PQ) is difficult
@@ -96,7 +101,7 @@ def write_heif(out_path, rgb_data, format="HEIF", quality=-1, bitdepth=10, yuv=N
     added_image = heif_file.add_frombytes(
         mode="RGB;16",
         size=imsize,
-        data=bytes(rgb_data),
+        data=memoryview(np.ascontiguousarray(rgb_data)).cast("B"),  # avoids copying to a bytes object
     )
     added_image.info["color_primaries"] = 9
     added_image.info["transfer_characteristics"] = 16
@@ -105,7 +110,9 @@ def write_heif(out_path, rgb_data, format="HEIF", quality=-1, bitdepth=10, yuv=N
     heif_file.save(out_path, format=format, quality=quality, chroma=yuv)
 
 
-def write_exr(out_path, rgb_data, bitdepth=16, colorspace="ITU-R BT.2020"):
+def write_exr(out_path, rgb_data, bitdepth=16, colorspace=DEFAULT_COLORSPACE):
+    import colour
+
     primaries = colour.RGB_COLOURSPACES[colorspace].primaries
     whitepoint = colour.RGB_COLOURSPACES[colorspace].whitepoint
     rgb_data *= REF_WHITE_LUM / 100  # change white luminance at RGB(1.0, 1.0, 1.0) to 100
@@ -1,50 +1,139 @@
 import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 import cv2
+import numba
 import numpy as np
 import numpy.typing as npt
 import pillow_heif
+from numba import njit, prange
 
 from apple_hdr_heic.metadata import AppleHDRMetadata
 
+# note: colour is only imported when needed (see _rgb_transform_matrix), since importing it is slow
 os.environ["COLOUR_SCIENCE__FILTER_USAGE_WARNINGS"] = "True"
 os.environ["COLOUR_SCIENCE__DEFAULT_FLOAT_DTYPE"] = "float32"
 
-import colour  # may raise a missing matplotlib warning
-
 REF_WHITE_LUM = 203.0  # reference white luminance in nits
 FloatNDArray = npt.NDArray[np.floating]
 
+# sRGB EOTF of every 8-bit code value (note: Display P3 and sRGB have the same EOTF)
+# note: same values as colour.models.eotf_sRGB in float32
+_SRGB_CODES = np.arange(256, dtype=np.float32) / np.float32(255)
+_SRGB_EOTF_LUT = np.where(
+    _SRGB_CODES <= np.float32(0.04045),
+    _SRGB_CODES / np.float32(12.92),
+    ((_SRGB_CODES + np.float32(0.055)) / np.float32(1.055)) ** np.float32(2.4),
+).astype(np.float32)
+
+# same as colour.matrix_RGB_to_RGB for "Display P3" to "ITU-R BT.2020"
+_DISPLAYP3_TO_BT2020 = np.array(
+    [
+        [0.7538329996229978, 0.19859732412085185, 0.04756958380240123],
+        [0.04574384540516263, 0.9417773066576491, 0.012478920476578309],
+        [-0.0012103397899965735, 0.017601738580605764, 0.9836086413478619],
+    ]
+)
+
+
+# note: Numba's workqueue threading layer (used when neither TBB nor OpenMP is available) aborts the process
+#       when parallel kernels are launched from several threads at once, so launches are serialized on it
+_KERNEL_LOCK = threading.Lock()
+
+
+@contextmanager
+def _kernel_launch() -> Iterator[None]:
+    try:
+        threading_layer = numba.threading_layer()
+    except ValueError:  # not known until the first parallel kernel has run
+        threading_layer = None
+    if threading_layer is None or threading_layer == "workqueue":
+        with _KERNEL_LOCK:
+            yield
+    else:
+        yield
+
 
 # ref https://developer.apple.com/documentation/appkit/images_and_pdf/applying_apple_hdr_effect_to_your_photos
 def apply_hdrgainmap(
-    dp3_sdr: FloatNDArray,
-    hdrgainmap: FloatNDArray,
+    dp3_sdr: FloatNDArray | npt.NDArray[np.uint8],
+    hdrgainmap: FloatNDArray | npt.NDArray[np.uint8],
     headroom: float,
 ) -> FloatNDArray:
     """
     Combine a (non-linear) Display P3 SDR image with its HDR gain map.
 
     :param dp3_sdr: A numpy array of shape (H, W, 3) with values between 0 and 1.
-    :param hdrgainmap: A numpy array of shape (H, W) with values between 0 and 1.
+    :param hdrgainmap: A numpy array of shape (H, W) with values between 0 and 1 (values outside are clipped).
+        Alternatively, both ``dp3_sdr`` and ``hdrgainmap`` may be uint8 arrays with 8-bit code values.
     :param headroom: The value returned by compute_headroom method of AppleHDRMetadata.
 
-    :returns: A numpy array of shape (H, W, 3) with values between 0 and ``headroom``.
+    :returns: A float32 numpy array of shape (H, W, 3) with values between 0 and ``headroom``.
     :exception AssertionError: if height and width of ``dp3_sdr`` does not match that of ``hdrgainmap``.
     """
-    assert np.issubdtype(dp3_sdr.dtype, np.floating)
-    assert np.issubdtype(hdrgainmap.dtype, np.floating)
-    # note: Display P3 and sRGB have the same EOTF
-    dp3_sdr_linear = colour.models.eotf_sRGB(dp3_sdr)
     assert dp3_sdr.shape[:2] == hdrgainmap.shape
     assert headroom >= 1.0
-    hdrgainmap_linear = colour.models.eotf_sRGB(hdrgainmap)
-    scale_factor_map = 1.0 + (headroom - 1.0) * hdrgainmap_linear  # between 1.0 and headroom
-    dp3_hdr_linear = dp3_sdr_linear * scale_factor_map[:, :, None]
+    if dp3_sdr.dtype == np.uint8:
+        assert hdrgainmap.dtype == np.uint8
+        dp3_hdr_linear = np.empty(dp3_sdr.shape, dtype=np.float32)
+        with _kernel_launch():
+            _apply_hdrgainmap_lut_kernel(dp3_sdr, hdrgainmap, _SRGB_EOTF_LUT, _gain_scale_lut(headroom), dp3_hdr_linear)
+        return dp3_hdr_linear
+    assert np.issubdtype(dp3_sdr.dtype, np.floating)
+    assert np.issubdtype(hdrgainmap.dtype, np.floating)
+    # note: computed in float32 (colour-science's default float dtype) for any floating point input,
+    #       which also covers float16 that Numba cannot compile
+    dp3_sdr = np.asarray(dp3_sdr, dtype=np.float32)
+    hdrgainmap = np.asarray(hdrgainmap, dtype=np.float32)
+    dp3_hdr_linear = np.empty(dp3_sdr.shape, dtype=np.float32)
+    with _kernel_launch():
+        _apply_hdrgainmap_kernel(dp3_sdr, hdrgainmap, np.float32(headroom), dp3_hdr_linear)
     return dp3_hdr_linear
 
 
+@njit(inline="always")
+def _eotf_srgb(v):
+    # note: Display P3 and sRGB have the same EOTF
+    t = type(v)  # constants in the precision of v
+    if v <= t(0.04045):
+        return v / t(12.92)
+    return ((v + t(0.055)) / t(1.055)) ** t(2.4)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _apply_hdrgainmap_kernel(dp3_sdr, hdrgainmap, headroom, out):
+    # linearize both inputs and apply the gain map in a single pass over the image
+    t = type(headroom)
+    zero, one = t(0.0), t(1.0)
+    for i in prange(dp3_sdr.shape[0]):
+        for j in range(dp3_sdr.shape[1]):
+            gain = min(max(t(hdrgainmap[i, j]), zero), one)
+            scale_factor = one + (headroom - one) * _eotf_srgb(gain)  # between 1.0 and headroom
+            for c in range(3):
+                out[i, j, c] = _eotf_srgb(t(dp3_sdr[i, j, c])) * scale_factor
+
+
+def _gain_scale_lut(headroom: float) -> npt.NDArray[np.float32]:
+    # scale factor of every 8-bit gain map code value, between 1.0 and headroom
+    headroom32 = np.float32(headroom)
+    return np.float32(1.0) + (headroom32 - np.float32(1.0)) * _SRGB_EOTF_LUT
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _apply_hdrgainmap_lut_kernel(dp3_sdr, hdrgainmap, lut, scale_lut, out):
+    # same as above, but linearizes 8-bit inputs and computes the scale factors using lookup tables
+    for i in prange(dp3_sdr.shape[0]):
+        for j in range(dp3_sdr.shape[1]):
+            scale_factor = scale_lut[hdrgainmap[i, j]]
+            for c in range(3):
+                out[i, j, c] = lut[dp3_sdr[i, j, c]] * scale_factor
+
+
 def clipped_colorspace_transform(
     rgb_linear: FloatNDArray, input_space_name: str, output_space_name: str
 ) -> FloatNDArray:
@@ -59,64 +148,230 @@ def clipped_colorspace_transform(
         with negative values truncated to zero.
     """
     assert np.issubdtype(rgb_linear.dtype, np.floating)
+    # note: float16 is computed in float32 (Numba cannot compile float16) and converted back
+    dtype = np.float64 if rgb_linear.dtype == np.float64 else np.float32
+    rgb_linear_in = np.asarray(rgb_linear, dtype=dtype)
+    transform_matrix = _rgb_transform_matrix(input_space_name, output_space_name).astype(dtype)
+    outrgb_linear = np.empty(rgb_linear_in.shape, dtype=dtype)
+    with _kernel_launch():
+        _transform_and_clip_kernel(rgb_linear_in, transform_matrix, outrgb_linear)
+    return outrgb_linear.astype(rgb_linear.dtype, copy=False)
+
+
+@lru_cache(maxsize=16)
+def _rgb_transform_matrix(input_space_name: str, output_space_name: str) -> FloatNDArray:
+    import colour  # may raise a missing matplotlib warning
+
     assert input_space_name in colour.RGB_COLOURSPACES
     assert output_space_name in colour.RGB_COLOURSPACES
     input_space = colour.RGB_COLOURSPACES[input_space_name]
     output_space = colour.RGB_COLOURSPACES[output_space_name]
-    transform_matrix = colour.matrix_RGB_to_RGB(input_space, output_space).astype(rgb_linear.dtype)
-    outrgb_linear = np.tensordot(rgb_linear, transform_matrix, axes=(2, 1))
-    return np.clip(outrgb_linear, 0.0, None, out=outrgb_linear)
-
-
-def load_primary_and_aux(file_name: str | Path, aux_type: str) -> tuple[FloatNDArray, FloatNDArray]:
+    transform_matrix = colour.matrix_RGB_to_RGB(input_space, output_space)
+    transform_matrix.setflags(write=False)  # shared between calls
+    return transform_matrix
+
+
+@njit(parallel=True, fastmath=True, boundscheck=False, cache=True)
+def _transform_and_clip_kernel(rgb, m, out):
+    # 3x3 matrix product and clipping of negative values in a single pass over the image
+    # note: the coefficients are loaded once, so that each output channel is three independent multiply-adds
+    m00, m01, m02 = m[0, 0], m[0, 1], m[0, 2]
+    m10, m11, m12 = m[1, 0], m[1, 1], m[1, 2]
+    m20, m21, m22 = m[2, 0], m[2, 1], m[2, 2]
+    zero = m.dtype.type(0.0)
+    for i in prange(rgb.shape[0]):
+        for j in range(rgb.shape[1]):
+            r = rgb[i, j, 0]
+            g = rgb[i, j, 1]
+            b = rgb[i, j, 2]
+            out[i, j, 0] = max(zero, m00 * r + m01 * g + m02 * b)
+            out[i, j, 1] = max(zero, m10 * r + m11 * g + m12 * b)
+            out[i, j, 2] = max(zero, m20 * r + m21 * g + m22 * b)
+
+
+def load_primary_and_aux(file_name: str | Path, aux_type: str) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
     """
     Loads the primary image and the auxiliary image of the specified aux_type from an HEIC file.
 
     :param file_name: A path to an HEIC image file containing HDR gain map data.
 
-    :returns: A tuple of float32 numpy arrays: (primary, aux)
+    :returns: A tuple of uint8 numpy arrays: (primary, aux)
     """
-    heif_file = pillow_heif.open_heif(file_name)
+    heif_file = _open_heif(file_name)
+    return _copy_pixels(heif_file), _copy_pixels(_get_aux_image(heif_file, aux_type))
+
+
+def _open_heif(file_name: str | Path) -> pillow_heif.HeifFile:
+    # note: the row padding is dropped by _copy_pixels instead, which avoids one more copy inside pillow_heif
+    return pillow_heif.open_heif(file_name, remove_stride=False)
+
+
+def _get_aux_image(heif_file: pillow_heif.HeifFile, aux_type: str) -> pillow_heif.HeifAuxImage:
     assert aux_type in heif_file.info["aux"]
     aux_id = heif_file.info["aux"][aux_type][0]
-    aux_im = heif_file.get_aux_image(aux_id)
-    return np.asarray(heif_file) / np.float32(255), np.asarray(aux_im) / np.float32(255)
+    return heif_file.get_aux_image(aux_id)
+
+
+def _copy_pixels(heif_image) -> npt.NDArray[np.uint8]:
+    # copies the decoded 8-bit pixel data to an (H, W, C) array, or (H, W) if C = 1, without the row padding
+    # note: a copy is required since the decoded buffer is freed along with the image object
+    width, height = heif_image.size
+    channels = len(heif_image.mode)  # "RGB" or "L"
+    rows = np.frombuffer(heif_image.data, dtype=np.uint8).reshape(height, heif_image.stride)
+    pixels = rows[:, : width * channels]
+    return np.array(pixels.reshape(height, width, channels) if channels > 1 else pixels)
 
 
-def load_as_displayp3_linear(file_name: str | Path) -> FloatNDArray:
+def load_as_displayp3_linear(file_name: str | Path, interpolation: int = cv2.INTER_LANCZOS4) -> FloatNDArray:
     """
     Loads an HEIC file and returns the HDR image in linear Display P3 color space.
 
     :param file_name: A path to an HEIC image file containing HDR gain map data.
+    :param interpolation: The OpenCV interpolation flag used to resize the HDR gain map. Default: ``cv2.INTER_LANCZOS4``
 
     :returns: A float32 numpy array of shape (H, W, 3) in linear Display P3 color space.
     """
-    hdr_metadata = AppleHDRMetadata.from_file(file_name)
+    dp3_sdr, hdrgainmap, headroom = load_sdr_and_hdrgainmap(file_name, interpolation)
+    return apply_hdrgainmap(dp3_sdr, hdrgainmap, headroom)
+
+
+def load_sdr_and_hdrgainmap(
+    file_name: str | Path, interpolation: int = cv2.INTER_LANCZOS4
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8], float]:
+    """
+    Loads the SDR image, its HDR gain map (resized to the size of the SDR image) and the headroom from an HEIC file.
+
+    :param file_name: A path to an HEIC image file containing HDR gain map data.
+    :param interpolation: The OpenCV interpolation flag used to resize the HDR gain map to the size of the image.
+        Default: ``cv2.INTER_LANCZOS4``; ``cv2.INTER_CUBIC`` is several times faster with a nearly identical result.
+
+    :returns: A tuple: (dp3_sdr, hdrgainmap, headroom), where ``dp3_sdr`` is a uint8 array of shape (H, W, 3)
+        and ``hdrgainmap`` is a uint8 array of shape (H, W).
+    """
+    heif_file = _open_heif(file_name)
+    hdr_metadata = AppleHDRMetadata.from_heif_info(heif_file.info)
+    if hdr_metadata.maker33 is None or hdr_metadata.maker48 is None or hdr_metadata.profile_desc is None:
+        # note: exiftool runs in a separate process and libheif releases the GIL while decoding,
+        #       so reading the metadata overlaps with decoding the primary image
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            hdr_metadata_future = executor.submit(AppleHDRMetadata.from_file, file_name)
+            dp3_sdr = _copy_pixels(heif_file)
+            hdr_metadata = hdr_metadata_future.result()
+    else:
+        dp3_sdr = _copy_pixels(heif_file)
     assert hdr_metadata.profile_desc.startswith("Display P3") or hdr_metadata.profile_desc == "Linear Gray"
     aux_type = hdr_metadata.aux_type or "urn:com:apple:photo:2020:aux:hdrgainmap"
     headroom = hdr_metadata.compute_headroom()
 
-    dp3_sdr, hdrgainmap = load_primary_and_aux(file_name, aux_type)
+    hdrgainmap = _copy_pixels(_get_aux_image(heif_file, aux_type))
     image_size = dp3_sdr.shape[1], dp3_sdr.shape[0]
-    hdrgainmap = cv2.resize(hdrgainmap, image_size, interpolation=cv2.INTER_LANCZOS4)  # type: ignore
-    np.clip(hdrgainmap, 0.0, 1.0, out=hdrgainmap)
-
-    return apply_hdrgainmap(dp3_sdr, hdrgainmap, headroom)
+    # note: resizing in uint8 saturates any overshoot from the Lanczos (or bicubic) filter
+    hdrgainmap = cv2.resize(hdrgainmap, image_size, interpolation=interpolation)  # type: ignore
+    return dp3_sdr, hdrgainmap, headroom
 
 
-def load_as_bt2020_linear(file_name: str | Path) -> FloatNDArray:
+def load_as_bt2020_linear(file_name: str | Path, interpolation: int = cv2.INTER_LANCZOS4) -> FloatNDArray:
     """
     Loads an HEIC file and returns the HDR image in linear BT.2020 color space.
 
     :param file_name: A path to an HEIC image file containing HDR gain map data.
+    :param interpolation: The OpenCV interpolation flag used to resize the HDR gain map. Default: ``cv2.INTER_LANCZOS4``
 
     :returns: A float32 array of shape (H, W, 3) in linear BT.2020 color space, with non-negative values.
     """
-    dp3_linear = load_as_displayp3_linear(file_name)
-    bt2020_linear = clipped_colorspace_transform(dp3_linear, "Display P3", "ITU-R BT.2020")
+    dp3_sdr, hdrgainmap, headroom = load_sdr_and_hdrgainmap(file_name, interpolation)
+    transform_matrix = _DISPLAYP3_TO_BT2020.astype(np.float32)
+    bt2020_linear = np.empty(dp3_sdr.shape, dtype=np.float32)
+    with _kernel_launch():
+        _bt2020_linear_pipeline_kernel(
+            dp3_sdr,
+            hdrgainmap,
+            _SRGB_EOTF_LUT,
+            _gain_scale_lut(headroom),
+            transform_matrix,
+            bt2020_linear,
+        )
     return bt2020_linear
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _bt2020_linear_pipeline_kernel(dp3_sdr, hdrgainmap, lut, scale_lut, m, out):
+    # apply_hdrgainmap and clipped_colorspace_transform fused in a single pass over the image,
+    # so that the linear Display P3 image is never stored
+    # note: the coefficients are loaded once, so that each output channel is three independent multiply-adds
+    m_coeffs = (m[0, 0], m[0, 1], m[0, 2], m[1, 0], m[1, 1], m[1, 2], m[2, 0], m[2, 1], m[2, 2])
+    for i in prange(hdrgainmap.shape[0]):
+        for j in range(hdrgainmap.shape[1]):
+            out[i, j, 0], out[i, j, 1], out[i, j, 2] = _bt2020_linear_pixel(
+                dp3_sdr, hdrgainmap, i, j, lut, scale_lut, m_coeffs
+            )
+
+
+@njit(inline="always")
+def _bt2020_linear_pixel(dp3_sdr, hdrgainmap, i, j, lut, scale_lut, m_coeffs):
+    # linear BT.2020 value of a pixel from its 8-bit SDR and gain map code values, with negative values clipped
+    # note: m_coeffs are the row-major coefficients of the 3x3 matrix, hoisted out of the pixel loop by the caller
+    m00, m01, m02, m10, m11, m12, m20, m21, m22 = m_coeffs
+    zero = np.float32(0.0)
+    scale_factor = scale_lut[hdrgainmap[i, j]]
+    r = lut[dp3_sdr[i, j, 0]] * scale_factor
+    g = lut[dp3_sdr[i, j, 1]] * scale_factor
+    b = lut[dp3_sdr[i, j, 2]] * scale_factor
+    return (
+        max(zero, m00 * r + m01 * g + m02 * b),
+        max(zero, m10 * r + m11 * g + m12 * b),
+        max(zero, m20 * r + m21 * g + m22 * b),
+    )
+
+
+def load_as_bt2100_pq(
+    file_name: str | Path, white_lum: float = REF_WHITE_LUM, interpolation: int = cv2.INTER_LANCZOS4
+) -> npt.NDArray[np.uint16]:
+    """
+    Loads an HEIC file and returns the HDR image in non-linear BT.2100 color space with PQ transfer function.
+
+    :param file_name: A path to an HEIC image file containing HDR gain map data.
+    :param white_lum: Luminance of reference white in cd/m2 (or nits). Default: 203 nits
+    :param interpolation: The OpenCV interpolation flag used to resize the HDR gain map. Default: ``cv2.INTER_LANCZOS4``
+
+    :returns: A uint16 array of shape (H, W, 3) in non-linear BT.2100 color space with PQ transfer function,
+        with values between 0 and 2^16 - 1.
+    """
+    dp3_sdr, hdrgainmap, headroom = load_sdr_and_hdrgainmap(file_name, interpolation)
+    transform_matrix = _DISPLAYP3_TO_BT2020.astype(np.float32)
+    bt2100_pq = np.empty(dp3_sdr.shape, dtype=np.uint16)
+    with _kernel_launch():
+        _bt2100_pq_pipeline_kernel(
+            dp3_sdr,
+            hdrgainmap,
+            _SRGB_EOTF_LUT,
+            _gain_scale_lut(headroom),
+            transform_matrix,
+            np.float32(white_lum),
+            bt2100_pq,
+        )
+    return bt2100_pq
+
+
+@njit(parallel=True, fastmath=False, cache=True)
+def _bt2100_pq_pipeline_kernel(dp3_sdr, hdrgainmap, lut, scale_lut, m, white_lum, out):
+    # apply_hdrgainmap, clipped_colorspace_transform and quantize_bt2020_to_bt2100_pq fused row by row,
+    # so that the intermediate float32 values of a row stay in cache instead of filling full-size images
+    # note: compiled without fastmath, for the same PQ values as quantize_bt2020_to_bt2100_pq
+    height, width = hdrgainmap.shape
+    # note: the coefficients are loaded once, so that each output channel is three independent multiply-adds
+    m_coeffs = (m[0, 0], m[0, 1], m[0, 2], m[1, 0], m[1, 1], m[1, 2], m[2, 0], m[2, 1], m[2, 2])
+    for i in prange(height):
+        bt2020_row = np.empty(width * 3, dtype=np.float32)
+        for j in range(width):
+            bt2020_row[3 * j], bt2020_row[3 * j + 1], bt2020_row[3 * j + 2] = _bt2020_linear_pixel(
+                dp3_sdr, hdrgainmap, i, j, lut, scale_lut, m_coeffs
+            )
+        out_row = out[i].reshape(width * 3)
+        for k in range(width * 3):
+            out_row[k] = _pq_quantize(bt2020_row[k], white_lum)
+
+
 def quantize_bt2020_to_bt2100_pq(
     bt2020_linear: FloatNDArray,
     white_lum: float = REF_WHITE_LUM,
@@ -130,8 +385,37 @@ def quantize_bt2020_to_bt2100_pq(
     :returns: A uint16 array of shape (H, W, 3) in non-linear BT.2100 color space with PQ transfer function,
         with values between 0 and 2^16 - 1.
     """
-    bt2100_pq = colour.models.eotf_inverse_BT2100_PQ(white_lum * bt2020_linear)
-    return quantize_unit_interval_to_uint16(bt2100_pq)
+    assert np.issubdtype(bt2020_linear.dtype, np.floating)
+    dtype = np.float64 if bt2020_linear.dtype == np.float64 else np.float32
+    flat_in = np.ascontiguousarray(bt2020_linear, dtype=dtype).ravel()
+    flat_out = np.empty(flat_in.size, dtype=np.uint16)
+    with _kernel_launch():
+        _pq_quantize_kernel(flat_in, flat_in.dtype.type(white_lum), flat_out)
+    return flat_out.reshape(bt2020_linear.shape)
+
+
+@njit(parallel=True, fastmath=False, cache=True)
+def _pq_quantize_kernel(flat_in, white_lum, flat_out):
+    # inverse EOTF and quantization in a single pass over the array
+    # note: compiled without fastmath, so that pow and rounding are not reassociated or approximated
+    for i in prange(flat_in.size):
+        flat_out[i] = _pq_quantize(flat_in[i], white_lum)
+
+
+@njit(inline="always")
+def _pq_quantize(x, white_lum):
+    # inverse EOTF of SMPTE ST 2084 (PQ) followed by quantization to uint16
+    # note: float32 constants keep the arithmetic in the input precision
+    m1 = np.float32(2610 / 16384)
+    m2 = np.float32(2523 / 4096 * 128)
+    c1 = np.float32(3424 / 4096)
+    c2 = np.float32(2413 / 4096 * 32)
+    c3 = np.float32(2392 / 4096 * 32)
+    # note: white_lum / 10000 is not precomputed, which would change the rounding of some outputs for no
+    #       measurable speedup, since the two powers dominate the cost
+    y = max(white_lum * x / np.float32(10000.0), np.float32(0.0)) ** m1
+    v = np.rint(((c1 + c2 * y) / (c3 * y + np.float32(1.0))) ** m2 * np.float32(65535.0))
+    return np.uint16(min(v, np.float32(65535.0)))
 
 
 def quantize_unit_interval_to_uint16(float_array: FloatNDArray) -> npt.NDArray[np.uint16]:
@@ -142,7 +426,23 @@ def quantize_unit_interval_to_uint16(float_array: FloatNDArray) -> npt.NDArray[n
 
     :returns: A uint16 numpy array.
     """
-    quantized = float_array * 0xFFFF
-    np.round(quantized, out=quantized)
-    np.clip(quantized, 0, 0xFFFF, out=quantized)
-    return quantized.astype(np.uint16)
+    assert np.issubdtype(float_array.dtype, np.floating)
+    dtype = np.float64 if float_array.dtype == np.float64 else np.float32
+    flat_in = np.ascontiguousarray(float_array, dtype=dtype).ravel()
+    flat_out = np.empty(flat_in.size, dtype=np.uint16)
+    with _kernel_launch():
+        _quantize_kernel(flat_in, flat_out)
+    return flat_out.reshape(float_array.shape)
+
+
+@njit(["void(float32[::1], uint16[::1])", "void(float64[::1], uint16[::1])"], parallel=True, fastmath=False, cache=True)
+def _quantize_kernel(flat_in, flat_out):
+    # scale, round (half to even), clip and cast in a single pass over the array
+    # note: compiled without fastmath, so that rounding follows IEEE semantics exactly as np.round does
+    for i in prange(flat_in.size):
+        v = np.rint(flat_in[i] * np.float32(65535.0))
+        if v < 0.0:
+            v = 0.0
+        elif v > 65535.0:
+            v = 65535.0
+        flat_out[i] = np.uint16(v)
@@ -1,6 +1,12 @@
-from dataclasses import dataclass
+import os
+import re
+import struct
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+import numpy.typing as npt
 from exiftool import ExifToolHelper
 
 
@@ -15,6 +21,31 @@ class AppleHDRMetadata:
     # TODO after Python 3.11, the return type should be Self
     @classmethod
     def from_file(cls, file_name: str | Path) -> "AppleHDRMetadata":
+        # exiftool is slow to start, so the tags are only read again if the file has changed
+        stat = os.stat(file_name)
+        metadata = cls._from_file_cached(os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size)
+        return replace(metadata)  # a copy, since the cached instance is shared
+
+    @classmethod
+    def from_heif_info(cls, info: dict) -> "AppleHDRMetadata":
+        # reads the tags from the info of a pillow_heif HeifFile, which avoids starting exiftool
+        # note: tags that are missing or cannot be parsed are left as None
+        metadata = cls()
+        if info.get("exif"):
+            maker_tags = _read_apple_maker_tags(info["exif"])
+            metadata.maker33 = maker_tags.get(0x0021)
+            metadata.maker48 = maker_tags.get(0x0030)
+        if info.get("icc_profile"):
+            metadata.profile_desc = _read_icc_profile_description(info["icc_profile"])
+        if info.get("xmp"):
+            version = re.search(rb"HDRGainMapVersion(?:=[\"']|>)(\d+)", info["xmp"])
+            metadata.hdrgainmap_version = int(version[1]) if version else None
+        metadata.aux_type = next((t for t in info.get("aux", {}) if t.endswith(":hdrgainmap")), None)
+        return metadata
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _from_file_cached(cls, file_name: str, mtime_ns: int, size: int) -> "AppleHDRMetadata":
         metadata = cls()
         # we are primarily interested in maker tags 33 (0x0021) and 48 (0x0030)
         # see https://github.com/exiftool/exiftool/blob/405674e0/lib/Image/ExifTool/Apple.pm
@@ -48,3 +79,76 @@ class AppleHDRMetadata:
             else:
                 stops = -0.303 * self.maker48 + 2.303
         return 2.0 ** max(stops, 0.0)
+
+    @staticmethod
+    def compute_headroom_batch(maker33: npt.ArrayLike, maker48: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        # same as compute_headroom, for arrays of maker tag values (e.g. of many images), without branching per value
+        maker33 = np.asarray(maker33, dtype=np.float64)
+        maker48 = np.asarray(maker48, dtype=np.float64)
+        low_gain = maker48 <= 0.01
+        slope = np.where(maker33 < 1.0, np.where(low_gain, -20.0, -0.101), np.where(low_gain, -70.0, -0.303))
+        intercept = np.where(maker33 < 1.0, np.where(low_gain, 1.8, 1.601), np.where(low_gain, 3.0, 2.303))
+        stops = slope * maker48 + intercept
+        return np.exp2(np.maximum(stops, 0.0))
+
+
+_TIFF_BYTE_ORDERS = {b"MM": ">", b"II": "<"}
+
+
+def _read_apple_maker_tags(exif: bytes) -> dict[int, float]:
+    # reads the rational tags of the Apple maker note from EXIF data, see the exiftool reference above
+    # returns an empty dict if there is no Apple maker note or it cannot be parsed
+    tiff = exif.removeprefix(b"Exif\x00\x00")
+    try:
+        byte_order = _TIFF_BYTE_ORDERS[tiff[:2]]
+        ifd0_offset = struct.unpack_from(byte_order + "I", tiff, 4)[0]
+        _, _, value = _read_ifd(tiff, ifd0_offset, byte_order)[0x8769]  # pointer to the Exif IFD
+        exif_ifd_offset = struct.unpack(byte_order + "I", value)[0]
+        _, count, value = _read_ifd(tiff, exif_ifd_offset, byte_order)[0x927C]
+        maker_note_offset = struct.unpack(byte_order + "I", value)[0]
+        maker_note = tiff[maker_note_offset : maker_note_offset + count]
+        if not maker_note.startswith(b"Apple iOS\x00"):
+            return {}
+        # note: the maker note has its own byte order, and its offsets are relative to its start
+        byte_order = _TIFF_BYTE_ORDERS[maker_note[12:14]]
+        maker_tags = {}
+        for tag, (field_type, count, value) in _read_ifd(maker_note, 14, byte_order).items():
+            if field_type in (5, 10) and count == 1:  # RATIONAL or SRATIONAL
+                offset = struct.unpack(byte_order + "I", value)[0]
+                num, den = struct.unpack_from(byte_order + ("ii" if field_type == 10 else "II"), maker_note, offset)
+                maker_tags[tag] = num / den
+        return maker_tags
+    except (KeyError, struct.error, ZeroDivisionError):
+        return {}
+
+
+def _read_ifd(data: bytes, ifd_offset: int, byte_order: str) -> dict[int, tuple[int, int, bytes]]:
+    # reads the entries of a TIFF image file directory as {tag: (field type, count, value or offset)}
+    num_entries = struct.unpack_from(byte_order + "H", data, ifd_offset)[0]
+    entries = {}
+    for k in range(num_entries):
+        tag, field_type, count, value = struct.unpack_from(byte_order + "HHI4s", data, ifd_offset + 2 + 12 * k)
+        entries[tag] = (field_type, count, value)
+    return entries
+
+
+def _read_icc_profile_description(icc_profile: bytes) -> str | None:
+    # reads the profile description tag of an ICC profile (v2 textDescriptionType or v4 multiLocalizedUnicodeType)
+    # see https://www.color.org/specification/ICC.1-2022-05.pdf
+    try:
+        tag_count = struct.unpack_from(">I", icc_profile, 128)[0]
+        for k in range(tag_count):
+            signature, offset, _ = struct.unpack_from(">4sII", icc_profile, 132 + 12 * k)
+            if signature != b"desc":
+                continue
+            tag_type = icc_profile[offset : offset + 4]
+            if tag_type == b"desc":
+                length = struct.unpack_from(">I", icc_profile, offset + 8)[0]
+                return icc_profile[offset + 12 : offset + 12 + length].rstrip(b"\x00").decode("latin-1")
+            if tag_type == b"mluc":  # the first record is used
+                length, string_offset = struct.unpack_from(">II", icc_profile, offset + 20)
+                start = offset + string_offset
+                return icc_profile[start : start + length].decode("utf-16-be")
+        return None
+    except (struct.error, UnicodeDecodeError):
+        return None
@@ -1,4 +1,7 @@
+import os
 import pathlib
+import subprocess
+import sys
 
 import numpy as np
 
@@ -6,6 +9,7 @@ from apple_hdr_heic.lib import (
     apply_hdrgainmap,
     clipped_colorspace_transform,
     load_as_bt2020_linear,
+    load_as_bt2100_pq,
     load_as_displayp3_linear,
     quantize_bt2020_to_bt2100_pq,
     quantize_unit_interval_to_uint16,
@@ -39,6 +43,29 @@ def test_apply_hdrgainmap() -> None:
     assert np.all(quant_hdr == qc_expected)
 
 
+def test_apply_hdrgainmap_float16_float64() -> None:
+    test_sdr = np.linspace(0.0, 1.0, num=12, dtype=np.float32).reshape(2, 2, 3)
+    test_gainmap = np.linspace(0.0, 1.0, num=4, dtype=np.float32).reshape(2, 2)
+    headroom = 4.0
+    test_hdr_expected = apply_hdrgainmap(test_sdr, test_gainmap, headroom)
+    test_hdr_f16 = apply_hdrgainmap(test_sdr.astype(np.float16), test_gainmap.astype(np.float16), headroom)
+    assert test_hdr_f16.dtype == np.float32
+    assert np.allclose(test_hdr_f16, test_hdr_expected, atol=1e-2)
+    test_hdr_f64 = apply_hdrgainmap(test_sdr.astype(np.float64), test_gainmap.astype(np.float64), headroom)
+    assert test_hdr_f64.dtype == np.float32
+    assert np.allclose(test_hdr_f64, test_hdr_expected, atol=1e-6)
+
+
+def test_apply_hdrgainmap_uint8() -> None:
+    test_sdr = np.arange(0, 256, 8, dtype=np.uint8).reshape(2, 4, 4)[:, :, :3]
+    test_gainmap = np.arange(0, 256, 32, dtype=np.uint8).reshape(2, 4)
+    headroom = 4.0
+    test_hdr = apply_hdrgainmap(test_sdr, test_gainmap, headroom)
+    assert test_hdr.dtype == np.float32
+    test_hdr_expected = apply_hdrgainmap(test_sdr / np.float32(255), test_gainmap / np.float32(255), headroom)
+    assert np.allclose(test_hdr, test_hdr_expected)
+
+
 def test_clipped_colorspace_transform() -> None:
     dp3 = np.array([[[0, 0, 0], [1, 1, 1]],
                     [[2, 0, 0], [0, 2, 2]]], dtype=np.float32)  # fmt: skip
@@ -50,6 +77,38 @@ def test_clipped_colorspace_transform() -> None:
     assert np.allclose(bt2020, bt2020_expected)
 
 
+def test_clipped_colorspace_transform_float16() -> None:
+    dp3 = np.array([[[0, 0, 0], [1, 1, 1]],
+                    [[2, 0, 0], [0, 2, 2]]], dtype=np.float16)  # fmt: skip
+    bt2020 = clipped_colorspace_transform(dp3, "Display P3", "ITU-R BT.2020")
+    assert np.all(bt2020 >= 0)
+    assert bt2020.dtype == np.float16
+    bt2020_expected = clipped_colorspace_transform(dp3.astype(np.float32), "Display P3", "ITU-R BT.2020")
+    assert np.allclose(bt2020, bt2020_expected, atol=1e-2)
+
+
+CONCURRENT_CALLS_SCRIPT = """
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from apple_hdr_heic.lib import apply_hdrgainmap, clipped_colorspace_transform, quantize_bt2020_to_bt2100_pq
+rng = np.random.default_rng(0)
+sdr, gainmap = rng.random((64, 64, 3), dtype=np.float32), rng.random((64, 64), dtype=np.float32)
+def pipeline(_):
+    hdr = clipped_colorspace_transform(apply_hdrgainmap(sdr, gainmap, 4.0), "Display P3", "ITU-R BT.2020")
+    return quantize_bt2020_to_bt2100_pq(hdr)
+expected = pipeline(None)
+with ThreadPoolExecutor(4) as executor:
+    assert all(np.array_equal(result, expected) for result in executor.map(pipeline, range(32)))
+"""
+
+
+def test_concurrent_calls() -> None:
+    # note: the workqueue threading layer aborts the process on concurrent kernel launches unless they are serialized
+    env = os.environ | {"NUMBA_THREADING_LAYER": "workqueue", "NUMBA_NUM_THREADS": "4"}
+    subp = subprocess.run([sys.executable, "-c", CONCURRENT_CALLS_SCRIPT], env=env, check=False)
+    assert subp.returncode == 0
+
+
 def test_load_as_dp3_lin() -> None:
     dp3_lin = load_as_displayp3_linear(DATA_DIR / "hdr-sample.heic")
     assert np.all(dp3_lin >= 0.0)
@@ -64,6 +123,14 @@ def test_load_as_bt2100_lin() -> None:
     assert bt2020_lin.dtype == np.float32
 
 
+def test_load_as_bt2100_pq() -> None:
+    bt2100_pq = load_as_bt2100_pq(DATA_DIR / "hdr-sample.heic")
+    assert bt2100_pq.dtype == np.uint16
+    bt2020_lin = load_as_bt2020_linear(DATA_DIR / "hdr-sample.heic")
+    bt2100_pq_expected = quantize_bt2020_to_bt2100_pq(bt2020_lin)
+    assert np.all(np.abs(bt2100_pq.astype(np.int32) - bt2100_pq_expected) <= 1)
+
+
 def test_quantize_bt2100_pq() -> None:
     bt2020 = np.array([[[0, 0.5, 1], [2, 3, 4]], [[8, 16, 32], [50, 100, 200]]], dtype=np.float32)  # fmt: skip
     bt2100_pq = quantize_bt2020_to_bt2100_pq(bt2020, white_lum=100)
@@ -71,3 +138,14 @@ def test_quantize_bt2100_pq() -> None:
     bt2100_pq_expected = [[[0, 28854, 33297], [37954, 40754, 42767]],
                           [[47679, 52631, 57571], [60721, 65535, 65535]]]  # fmt: skip
     assert np.all(bt2100_pq == bt2100_pq_expected)
+
+
+def test_quantize_bt2100_pq_float64_reference() -> None:
+    # the float32 kernel stays within one code of the PQ inverse EOTF evaluated in float64
+    bt2020 = np.random.default_rng(0).uniform(0.0, 16.0, size=(1000, 100, 3)).astype(np.float32)
+    bt2100_pq = quantize_bt2020_to_bt2100_pq(bt2020)
+    m1, m2 = 2610 / 16384, 2523 / 4096 * 128
+    c1, c2, c3 = 3424 / 4096, 2413 / 4096 * 32, 2392 / 4096 * 32
+    y = (bt2020.astype(np.float64) * 203.0 / 10000.0) ** m1
+    bt2100_pq_expected = np.round(((c1 + c2 * y) / (1.0 + c3 * y)) ** m2 * 65535.0)
+    assert np.all(np.abs(bt2100_pq - bt2100_pq_expected) <= 1)
@@ -0,0 +1,104 @@
+import pathlib
+import struct
+
+import numpy as np
+import pillow_heif
+import pytest
+
+from apple_hdr_heic import AppleHDRMetadata, lib
+
+HDRGAINMAP_AUX_TYPE = "urn:com:apple:photo:2020:aux:hdrgainmap"
+
+
+def _apple_exif(maker_tags: dict[int, tuple[int, int]]) -> bytes:
+    # little-endian EXIF data with IFD0 -> Exif IFD -> big-endian Apple maker note with the given SRATIONAL tags
+    values_offset = 14 + 2 + 12 * len(maker_tags) + 4
+    maker_note = b"Apple iOS\x00\x00\x01MM" + struct.pack(">H", len(maker_tags))
+    for k, tag in enumerate(maker_tags):
+        maker_note += struct.pack(">2HII", tag, 10, 1, values_offset + 8 * k)
+    maker_note += struct.pack(">I", 0)
+    for num, den in maker_tags.values():
+        maker_note += struct.pack(">ii", num, den)
+    exif = b"Exif\x00\x00II*\x00" + struct.pack("<IH2HIII", 8, 1, 0x8769, 4, 1, 26, 0)
+    return exif + struct.pack("<H2HIII", 1, 0x927C, 7, len(maker_note), 44, 0) + maker_note
+
+
+def _icc_profile_v4(description: str) -> bytes:
+    # ICC profile with only a profile description tag of multiLocalizedUnicodeType
+    desc = description.encode("utf-16-be")
+    tag = b"mluc" + struct.pack(">4xII2s2sII", 1, 12, b"en", b"US", len(desc), 28) + desc
+    return bytes(128) + struct.pack(">I4sII", 1, b"desc", 144, len(tag)) + tag
+
+
+def _icc_profile_v2(description: str) -> bytes:
+    # ICC profile with only a profile description tag of textDescriptionType
+    desc = description.encode("ascii") + b"\x00"
+    tag = b"desc" + struct.pack(">4xI", len(desc)) + desc
+    return bytes(128) + struct.pack(">I4sII", 1, b"desc", 144, len(tag)) + tag
+
+
+def test_compute_headroom_batch() -> None:
+    maker33 = [0.5, 0.5, 1.2, 1.2, 1.2]
+    maker48 = [0.005, 0.3, 0.005, 0.3, 9.0]
+    headroom = AppleHDRMetadata.compute_headroom_batch(maker33, maker48)
+    for m33, m48, h in zip(maker33, maker48, headroom, strict=True):
+        assert h == AppleHDRMetadata(maker33=m33, maker48=m48).compute_headroom()
+    assert headroom[-1] == 1.0
+
+
+def test_from_heif_info() -> None:
+    exif = _apple_exif({0x21: (6, 5), 0x30: (3, 10)})  # HDRHeadroom = 1.2 and HDRGain = 0.3
+    info = {
+        "exif": exif,
+        "icc_profile": _icc_profile_v4("Display P3"),
+        "xmp": b'<rdf:Description HDRGainMap:HDRGainMapVersion="65536"/>',
+        "aux": {HDRGAINMAP_AUX_TYPE: [2]},
+    }
+    metadata = AppleHDRMetadata.from_heif_info(info)
+    assert metadata == AppleHDRMetadata(
+        maker33=1.2,
+        maker48=0.3,
+        profile_desc="Display P3",
+        hdrgainmap_version=65536,
+        aux_type=HDRGAINMAP_AUX_TYPE,
+    )
+    assert AppleHDRMetadata.from_heif_info({"exif": exif[:40], "aux": {}}) == AppleHDRMetadata()
+
+
+def test_from_heif_info_icc_v2() -> None:
+    metadata = AppleHDRMetadata.from_heif_info({"icc_profile": _icc_profile_v2("Display P3"), "aux": {}})
+    assert metadata == AppleHDRMetadata(profile_desc="Display P3")
+
+
+def test_exiftool_fallback(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    gainmap_file = tmp_path / "gainmap.heic"
+    pillow_heif.from_bytes("L", (4, 3), bytes(range(12))).save(gainmap_file, quality=-1)
+    monkeypatch.setattr(lib, "_get_aux_image", lambda heif_file, aux_type: pillow_heif.open_heif(gainmap_file))
+    exiftool_metadata = AppleHDRMetadata(maker33=0.5, maker48=0.005, profile_desc="Display P3")
+    exiftool_calls = []
+
+    def from_file(file_name: str | pathlib.Path) -> AppleHDRMetadata:
+        exiftool_calls.append(file_name)
+        return exiftool_metadata
+
+    monkeypatch.setattr(AppleHDRMetadata, "from_file", from_file)
+
+    def write_primary(file_name: pathlib.Path, maker_tags: dict[int, tuple[int, int]]) -> pathlib.Path:
+        primary = pillow_heif.from_bytes("RGB", (8, 6), np.zeros((6, 8, 3), dtype=np.uint8).tobytes())
+        primary.info["exif"] = _apple_exif(maker_tags)
+        primary.info["icc_profile"] = _icc_profile_v4("Display P3")
+        primary.save(file_name, quality=-1)
+        return file_name
+
+    # all tags are in the file, so exiftool is not used
+    complete_file = write_primary(tmp_path / "complete.heic", {0x21: (6, 5), 0x30: (3, 10)})
+    _, hdrgainmap, headroom = lib.load_sdr_and_hdrgainmap(complete_file)
+    assert hdrgainmap.shape == (6, 8)
+    assert headroom == AppleHDRMetadata(maker33=1.2, maker48=0.3).compute_headroom()
+    assert exiftool_calls == []
+
+    # HDRGain (maker tag 48) is missing, so the metadata is read with exiftool instead
+    incomplete_file = write_primary(tmp_path / "incomplete.heic", {0x21: (6, 5)})
+    _, _, headroom = lib.load_sdr_and_hdrgainmap(incomplete_file)
+    assert headroom == exiftool_metadata.compute_headroom()
+    assert exiftool_calls == [incomplete_file]